@@ -3,37 +3,76 @@
 Example of using the TDD wrapper with Claude Code
 """
 
+import math
 import sys
 from pathlib import Path
 
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
 # This file demonstrates how the TDD wrapper enforces test-driven development
 
 def calculate_fibonacci(n):
     """Calculate the nth Fibonacci number"""
-    if n <= 0:
-        return 0
-    elif n == 1:
-        return 1
-    else:
-        return calculate_fibonacci(n-1) + calculate_fibonacci(n-2)
+    a, b = 0, 1
+    for _ in range(max(n, 0)):
+        a, b = b, a + b
+    return a
 
 def factorial(n):
     """Calculate factorial of n"""
     if n < 0:
         raise ValueError("Factorial is not defined for negative numbers")
-    if n == 0:
-        return 1
-    return n * factorial(n - 1)
+    return math.factorial(n)
 
-def is_prime(n):
-    """Check if a number is prime"""
+def _is_prime(n):
+    """Trial division over 6k ± 1 candidates"""
     if n < 2:
         return False
-    for i in range(2, int(n**0.5) + 1):
-        if n % i == 0:
+    if n < 4:
+        return True
+    if n % 2 == 0 or n % 3 == 0:
+        return False
+    # Every remaining prime candidate has the form 6k ± 1
+    i = 5
+    while i * i <= n:
+        if n % i == 0 or n % (i + 2) == 0:
             return False
+        i += 6
     return True
 
+# Compile the trial-division loop to native code when Numba is installed
+_is_prime_native = numba.njit(cache=True)(_is_prime) if HAS_NUMBA else None
+
+def is_prime(n):
+    """Check if a number is prime"""
+    # The native kernel works on 64-bit ints; larger values stay in Python
+    if _is_prime_native is not None and abs(n) < 2 ** 62:
+        return bool(_is_prime_native(n))
+    return _is_prime(n)
+
+def sieve(limit):
+    """Return a bytearray where index i is 1 if i is prime, for 0 <= i <= limit"""
+    if limit < 2:
+        return bytearray(max(limit + 1, 0))
+    flags = bytearray([1]) * (limit + 1)
+    flags[0] = flags[1] = 0
+    for p in range(2, int(limit ** 0.5) + 1):
+        if flags[p]:
+            flags[p * p::p] = bytes(len(range(p * p, limit + 1, p)))
+    return flags
+
+def are_prime(numbers):
+    """Check many numbers for primality with a single sieve"""
+    numbers = list(numbers)
+    if not numbers:
+        return []
+    flags = sieve(max(numbers))
+    return [n >= 2 and bool(flags[n]) for n in numbers]
+
 def main():
     """Main function demonstrating TDD workflow"""
     print("TDD Example - Mathematical Functions")
@@ -3,8 +3,10 @@
 Test file for example_usage.py - demonstrates TDD practices
 """
 
+import sys
+
 import pytest
-from example_usage import calculate_fibonacci, factorial, is_prime
+from example_usage import calculate_fibonacci, factorial, is_prime, are_prime, sieve
 
 class TestFibonacci:
     """Test cases for Fibonacci calculation"""
@@ -25,6 +27,11 @@ class TestFibonacci:
         """Test Fibonacci for larger numbers"""
         assert calculate_fibonacci(10) == 55
         assert calculate_fibonacci(15) == 610
+    
+    def test_fibonacci_beyond_recursion_limit(self):
+        """Test Fibonacci for inputs deeper than the recursion limit"""
+        n = sys.getrecursionlimit() * 2
+        assert calculate_fibonacci(n) == calculate_fibonacci(n - 1) + calculate_fibonacci(n - 2)
 
 class TestFactorial:
     """Test cases for factorial calculation"""
@@ -65,6 +72,24 @@ class TestPrime:
         for c in composites:
             assert not is_prime(c), f"{c} should not be prime"
 
+class TestSieve:
+    """Test cases for bulk prime checking"""
+    
+    def test_sieve_small_limits(self):
+        """Test sieve for limits below the first prime"""
+        assert list(sieve(-1)) == []
+        assert list(sieve(0)) == [0]
+        assert list(sieve(1)) == [0, 0]
+    
+    def test_are_prime_matches_is_prime(self):
+        """Test that bulk checking agrees with scalar checking"""
+        numbers = list(range(-5, 1000))
+        assert are_prime(numbers) == [is_prime(n) for n in numbers]
+    
+    def test_are_prime_empty(self):
+        """Test bulk checking with no numbers"""
+        assert are_prime([]) == []
+
 # Example of TDD workflow:
 # 1. Write these tests first (they will fail)
 # 2. Run: tdd-python example_usage.py (will fail)
@@ -36,6 +36,9 @@ setup(
         ],
         "yaml": [
             "pyyaml>=5.3.0",
+        ],
+        "fast": [
+            "orjson>=3.0.0",
         ]
     },
     python_requires=">=3.7",
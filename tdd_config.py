@@ -3,10 +3,13 @@
 TDD Configuration Management
 """
 
+import fnmatch
 import json
 import os
+import pickle
+import re
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Pattern, Tuple
 
 try:
     import yaml
@@ -14,6 +17,76 @@ try:
 except ImportError:
     HAS_YAML = False
 
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+# First global config location that exists, resolved once per process
+GLOBAL_CONFIG_PATH = next(
+    (
+        path for path in [
+            Path.home() / '.tdd-config.json',
+            Path.home() / '.config' / 'tdd' / 'config.json',
+            Path('/etc/tdd/config.json')
+        ]
+        if path.exists()
+    ),
+    None
+)
+
+# Pickled parses of config files keyed by path, tagged with the
+# (st_mtime_ns, st_size) they were read at; each load unpickles a private
+# copy so instances never share mutable values
+_CONFIG_CACHE: Dict[Path, Tuple[Tuple[int, int], bytes]] = {}
+
+def _segment_to_regex(segment: str) -> str:
+    """Translate one path component glob into a regex that cannot cross '/'"""
+    regex = re.sub(r'\\[Zz]$', '', fnmatch.translate(segment))
+    parts = []
+    i = 0
+    
+    # fnmatch lets '.' and negated classes match '/', which Path.match
+    # never sees inside a single component
+    while i < len(regex):
+        char = regex[i]
+        if char == '\\':
+            parts.append(regex[i:i + 2])
+            i += 2
+            continue
+        if char == '[':
+            end = i + 1
+            negated = regex[end] == '^'
+            end += negated
+            end += regex[end] == ']'
+            while regex[end] != ']':
+                end += 2 if regex[end] == '\\' else 1
+            if negated:
+                parts.append('(?!/)')
+            parts.append(regex[i:end + 1])
+            i = end + 1
+            continue
+        parts.append('[^/]' if char == '.' else char)
+        i += 1
+    
+    return ''.join(parts)
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translate a path glob into a regex with Path.match semantics"""
+    segments = [part for part in pattern.split('/') if part not in ('', '.')]
+    body = '/'.join(_segment_to_regex(part) for part in segments)
+    
+    # Relative patterns match trailing path components, like Path.match
+    anchor = '^/' if pattern.startswith('/') else '(?:^|/)'
+    return anchor + body + '$'
+
+def compile_patterns(patterns: List[str]) -> Pattern:
+    """Combine path globs into a single compiled regex"""
+    if not patterns:
+        return re.compile('(?!)')
+    return re.compile('|'.join(f"(?:{_glob_to_regex(p)})" for p in patterns))
+
 class TDDConfig:
     """Manage TDD configuration with inheritance and overrides"""
     
@@ -96,13 +169,18 @@ class TDDConfig:
         }
     }
     
+    # Unpickling a snapshot builds a fresh, unshared copy of the defaults
+    # several times faster than copy.deepcopy
+    _DEFAULT_CONFIG_PICKLE = pickle.dumps(DEFAULT_CONFIG, pickle.HIGHEST_PROTOCOL)
+    
     def __init__(self, config_path: Optional[Path] = None):
         self.config_path = config_path or Path.cwd() / '.tdd-config.json'
         self.config = self.load_config()
+        self._flat = self._flatten(self.config)
     
     def load_config(self) -> Dict:
         """Load configuration with inheritance"""
-        config = self.DEFAULT_CONFIG.copy()
+        config = pickle.loads(self._DEFAULT_CONFIG_PICKLE)
         
         # Load global config
         global_config = self._load_global_config()
@@ -110,8 +188,8 @@ class TDDConfig:
             config = self._merge_configs(config, global_config)
         
         # Load project config
-        if self.config_path.exists():
-            project_config = self._load_file(self.config_path)
+        project_config = self._load_file(self.config_path)
+        if project_config:
             config = self._merge_configs(config, project_config)
         
         # Load environment overrides
@@ -125,21 +203,15 @@ class TDDConfig:
         """Save configuration to file"""
         config = config or self.config
         
-        with open(self.config_path, 'w') as f:
-            json.dump(config, f, indent=2)
+        if HAS_ORJSON:
+            self.config_path.write_bytes(orjson.dumps(config, option=orjson.OPT_INDENT_2))
+        else:
+            with open(self.config_path, 'w') as f:
+                json.dump(config, f, indent=2)
     
     def get(self, key: str, default=None):
         """Get configuration value with dot notation support"""
-        keys = key.split('.')
-        value = self.config
-        
-        for k in keys:
-            if isinstance(value, dict) and k in value:
-                value = value[k]
-            else:
-                return default
-        
-        return value
+        return self._flat.get(key, default)
     
     def set(self, key: str, value):
         """Set configuration value with dot notation support"""
@@ -152,6 +224,7 @@ class TDDConfig:
             config = config[k]
         
         config[keys[-1]] = value
+        self._flat = self._flatten(self.config)
         self.save_config()
     
     def validate(self) -> List[str]:
@@ -179,13 +252,29 @@ class TDDConfig:
         return errors
     
     def _load_file(self, path: Path) -> Dict:
-        """Load configuration from file"""
-        if not path.exists():
+        """Load configuration from file, reusing the parse while it is unchanged"""
+        try:
+            st = path.stat()
+        except OSError:
             return {}
         
+        # Size catches rewrites within one mtime tick on coarse filesystems
+        version = (st.st_mtime_ns, st.st_size)
+        cached = _CONFIG_CACHE.get(path)
+        if cached and cached[0] == version:
+            return pickle.loads(cached[1])
+        
+        config = self._parse_file(path)
+        _CONFIG_CACHE[path] = (
+            version, pickle.dumps(config, pickle.HIGHEST_PROTOCOL)
+        )
+        return config
+    
+    def _parse_file(self, path: Path) -> Dict:
+        """Parse a JSON or YAML configuration file"""
         if path.suffix == '.json':
-            with open(path, 'r') as f:
-                return json.load(f)
+            data = path.read_bytes()
+            return orjson.loads(data) if HAS_ORJSON else json.loads(data)
         elif path.suffix in ['.yml', '.yaml']:
             if HAS_YAML:
                 with open(path, 'r') as f:
@@ -198,15 +287,8 @@ class TDDConfig:
     
     def _load_global_config(self) -> Optional[Dict]:
         """Load global configuration from user home"""
-        global_paths = [
-            Path.home() / '.tdd-config.json',
-            Path.home() / '.config' / 'tdd' / 'config.json',
-            Path('/etc/tdd/config.json')
-        ]
-        
-        for path in global_paths:
-            if path.exists():
-                return self._load_file(path)
+        if GLOBAL_CONFIG_PATH:
+            return self._load_file(GLOBAL_CONFIG_PATH)
         
         return None
     
@@ -215,43 +297,63 @@ class TDDConfig:
         config = {}
         prefix = 'TDD_'
         
-        for key, value in os.environ.items():
-            if key.startswith(prefix):
-                # Convert TDD_COVERAGE_ENABLED to coverage.enabled
-                config_key = key[len(prefix):].lower().replace('_', '.')
-                
-                # Try to parse JSON values
-                try:
-                    config_value = json.loads(value)
-                except json.JSONDecodeError:
-                    # Handle boolean strings
-                    if value.lower() in ['true', 'false']:
-                        config_value = value.lower() == 'true'
-                    else:
-                        config_value = value
-                
-                # Build nested dictionary
-                keys = config_key.split('.')
-                current = config
-                for k in keys[:-1]:
-                    if k not in current:
-                        current[k] = {}
-                    current = current[k]
-                current[keys[-1]] = config_value
+        tdd_items = [(k, v) for k, v in os.environ.items() if k.startswith(prefix)]
+        if not tdd_items:
+            return config
+        
+        for key, value in tdd_items:
+            # Convert TDD_COVERAGE_ENABLED to coverage.enabled
+            config_key = key[len(prefix):].lower().replace('_', '.')
+            
+            # Try to parse JSON values
+            try:
+                config_value = json.loads(value)
+            except json.JSONDecodeError:
+                # Handle boolean strings
+                if value.lower() in ['true', 'false']:
+                    config_value = value.lower() == 'true'
+                else:
+                    config_value = value
+            
+            # Build nested dictionary
+            keys = config_key.split('.')
+            current = config
+            for k in keys[:-1]:
+                if k not in current:
+                    current[k] = {}
+                current = current[k]
+            current[keys[-1]] = config_value
         
         return config
     
-    def _merge_configs(self, base: Dict, override: Dict) -> Dict:
-        """Deep merge two configuration dictionaries"""
-        result = base.copy()
+    def _flatten(self, config: Dict, prefix: str = '') -> Dict:
+        """Map every dotted key path to its value for constant-time lookup"""
+        flat = {}
         
-        for key, value in override.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._merge_configs(result[key], value)
-            else:
-                result[key] = value
+        for key, value in config.items():
+            path = f"{prefix}{key}"
+            flat[path] = value
+            if isinstance(value, dict):
+                flat.update(self._flatten(value, f"{path}."))
         
-        return result
+        return flat
+    
+    def _merge_configs(self, base: Dict, override: Dict) -> Dict:
+        """Deep merge override into base in place and return base"""
+        stack = [(base, override)]
+        
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                if isinstance(value, dict):
+                    # Copy nested dicts rather than aliasing the source
+                    if not isinstance(target.get(key), dict):
+                        target[key] = {}
+                    stack.append((target[key], value))
+                else:
+                    target[key] = value
+        
+        return base
 
 class TDDRules:
     """Define and enforce TDD rules"""
@@ -259,6 +361,7 @@ class TDDRules:
     def __init__(self, config: TDDConfig):
         self.config = config
         self.rules = self._load_rules()
+        self._test_re = compile_patterns(self.config.get('test_patterns', []))
     
     def _load_rules(self) -> List[Dict]:
         """Load TDD rules from configuration"""
@@ -332,10 +435,8 @@ class TDDRules:
         if not impl_file or not test_file:
             return None
         
-        impl_stat = Path(impl_file).stat()
-        test_stat = Path(test_file).stat()
-        
-        if impl_stat.st_mtime < test_stat.st_mtime:
+        # Integer nanosecond mtimes compare exactly, without float rounding
+        if os.stat(impl_file).st_mtime_ns < os.stat(test_file).st_mtime_ns:
             return "Implementation was modified before test"
         
         return None
@@ -356,12 +457,8 @@ class TDDRules:
         if not test_file:
             return None
         
-        path = Path(test_file)
-        patterns = self.config.get('test_patterns', [])
-        
-        for pattern in patterns:
-            if path.match(pattern):
-                return None
+        if self._test_re.search(Path(test_file).as_posix()):
+            return None
         
         return f"Test file '{test_file}' doesn't match naming patterns"
     
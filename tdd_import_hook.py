@@ -4,15 +4,33 @@ Custom Python import hook for TDD enforcement
 """
 
 import sys
+import time
 import importlib.abc
 import importlib.machinery
 import importlib.util
+from collections import OrderedDict
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
 import warnings
 
 from tdd_tracker import TDDDatabase
-from tdd_config import TDDConfig
+from tdd_config import TDDConfig, compile_patterns
+
+# Top-level packages that are never subject to TDD checks. Python 3.10+
+# reports the full standard library; older versions fall back to a short list.
+STDLIB_PREFIXES = frozenset(getattr(sys, 'stdlib_module_names', ())) | {
+    'os', 'sys', 'json', 'pathlib', 'datetime', 'collections',
+    'itertools', 'functools', 'typing', 're', 'math', 'random',
+    'subprocess', 'threading', 'multiprocessing', 'asyncio'
+} | frozenset(sys.builtin_module_names)
+
+THIRDPARTY_PREFIXES = frozenset({
+    'numpy', 'pandas', 'matplotlib', 'requests', 'flask', 'django',
+    'pytest', 'setuptools', 'pip', 'wheel'
+})
+
+# Most needs_test verdicts kept per hook, evicted least recently used first
+_NEEDS_TEST_CACHE_SIZE = 4096
 
 class TDDImportHook(importlib.abc.MetaPathFinder):
     """Import hook that enforces TDD practices"""
@@ -23,12 +41,18 @@ class TDDImportHook(importlib.abc.MetaPathFinder):
         self.enabled = self.config.get('import_hook.enabled', False)
         self.warn_only = self.config.get('import_hook.warn_only', True)
         self.checked_modules = set()
+        self._test_re = compile_patterns(self.config.get('test_patterns', []))
+        # (module file, mtime, size, database state) -> (needs, reason, expiry)
+        self._needs_test_cache: OrderedDict = OrderedDict()
     
     def find_spec(self, fullname, path, target=None):
         """Called when Python tries to import a module"""
         if not self.enabled:
             return None
         
+        # Interned names make repeat checked_modules lookups pointer comparisons
+        fullname = sys.intern(fullname)
+        
         # Skip if already checked
         if fullname in self.checked_modules:
             return None
@@ -37,65 +61,68 @@ class TDDImportHook(importlib.abc.MetaPathFinder):
         if self._is_stdlib_or_thirdparty(fullname):
             return None
         
-        # Find the actual module file
-        spec = self._find_module_spec(fullname, path)
+        # Find the actual module file. The resolved spec is handed back to
+        # the import system so it does not walk sys.meta_path a second time.
+        spec = self._find_module_spec(fullname, path, target)
         if not spec or not spec.origin:
-            return None
+            return spec
         
         module_file = Path(spec.origin)
         
         # Skip if not a Python file or doesn't exist
         if not module_file.suffix == '.py' or not module_file.exists():
-            return None
+            return spec
         
         # Check if it's a test file
         if self._is_test_file(module_file):
-            return None
+            return spec
         
         # Check TDD compliance
-        needs_test, reason = self.db.needs_test(str(module_file))
+        needs_test, reason = self._needs_test(module_file)
         
         if needs_test:
             self._handle_violation(fullname, module_file, reason)
         
         self.checked_modules.add(fullname)
-        return None  # Let normal import continue
+        return spec
     
-    def _find_module_spec(self, fullname, path):
+    def _find_module_spec(self, fullname, path, target=None):
         """Find the module spec using standard finders"""
         for finder in sys.meta_path:
             if finder is self:
                 continue
             if hasattr(finder, 'find_spec'):
-                spec = finder.find_spec(fullname, path)
+                spec = finder.find_spec(fullname, path, target)
                 if spec:
                     return spec
         return None
     
+    def _needs_test(self, module_file: Path) -> Tuple[bool, str]:
+        """Query the database once per file version and database state"""
+        st = module_file.stat()
+        key = (str(module_file), st.st_mtime_ns, st.st_size, self.db.state_version())
+        cache = self._needs_test_cache
+        
+        result = cache.get(key)
+        if result is not None and (result[2] is None or time.time_ns() // 1000 < result[2]):
+            cache.move_to_end(key)
+            return result[:2]
+        
+        result = cache[key] = self.db.test_status(key[0])
+        cache.move_to_end(key)
+        if len(cache) > _NEEDS_TEST_CACHE_SIZE:
+            cache.popitem(last=False)
+        
+        return result[:2]
+    
     def _is_stdlib_or_thirdparty(self, fullname):
         """Check if module is from standard library or third-party"""
-        # Simple heuristic: check if it starts with known prefixes
-        stdlib_prefixes = [
-            'os', 'sys', 'json', 'pathlib', 'datetime', 'collections',
-            'itertools', 'functools', 'typing', 're', 'math', 'random',
-            'subprocess', 'threading', 'multiprocessing', 'asyncio'
-        ]
-        
-        thirdparty_prefixes = [
-            'numpy', 'pandas', 'matplotlib', 'requests', 'flask', 'django',
-            'pytest', 'setuptools', 'pip', 'wheel'
-        ]
-        
-        root = fullname.split('.')[0]
-        return root in stdlib_prefixes or root in thirdparty_prefixes
+        root = fullname.partition('.')[0]
+        return root in STDLIB_PREFIXES or root in THIRDPARTY_PREFIXES
     
     def _is_test_file(self, filepath: Path):
         """Check if file is a test file"""
-        patterns = self.config.get('test_patterns', [])
-        for pattern in patterns:
-            if filepath.match(pattern):
-                return True
-        return False
+        return bool(self._test_re.search(filepath.as_posix()))
     
     def _handle_violation(self, module_name, module_file, reason):
         """Handle TDD violation during import"""
@@ -136,16 +163,18 @@ def install_import_hook():
     if hook.enabled and hook not in sys.meta_path:
         # Insert after built-in importers but before others
         sys.meta_path.insert(2, hook)
-        print("🔗 TDD import hook installed")
+        if hook.config.get('notifications.enabled'):
+            print("🔗 TDD import hook installed")
     return hook
 
 def uninstall_import_hook():
     """Remove the TDD import hook"""
-    sys.meta_path = [
-        finder for finder in sys.meta_path 
-        if not isinstance(finder, TDDImportHook)
-    ]
-    print("🔗 TDD import hook removed")
+    hooks = [f for f in sys.meta_path if isinstance(f, TDDImportHook)]
+    for hook in hooks:
+        sys.meta_path.remove(hook)
+        hook.db.close()
+    if any(hook.config.get('notifications.enabled') for hook in hooks):
+        print("🔗 TDD import hook removed")
 
 class TDDContext:
     """Context manager for temporary TDD enforcement"""
@@ -176,10 +205,11 @@ class TDDContext:
             self.hook.warn_only = self.original_warn_only
             
             if not self.original_enabled:
-                sys.meta_path = [
-                    f for f in sys.meta_path 
-                    if f is not self.hook
-                ]
+                try:
+                    sys.meta_path.remove(self.hook)
+                except ValueError:
+                    pass
+                self.hook.db.close()
 
 # Automatic installation if configured
 if __name__ != '__main__':
@@ -4,43 +4,210 @@ Advanced TDD State Tracker with visualization and reporting
 """
 
 import json
+import mmap
+import os
 import sqlite3
+import threading
 import time
-from datetime import datetime, timedelta
+import weakref
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import hashlib
-import subprocess
+
+# Timestamps are stored as INTEGER microseconds since the Unix epoch
+US_PER_SECOND = 1_000_000
+STALE_AFTER_US = 3600 * US_PER_SECOND
+SCHEMA_VERSION = 1
+
+# SQL statements are module-level constants so every call reuses the same
+# string object as the key into the connection's prepared-statement cache
+_SQL_INSERT_FILE_STATE = '''
+    INSERT OR REPLACE INTO file_state
+    (filepath, file_hash, last_modified, last_tested, test_passed, test_coverage)
+    VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_TEST_RUN = '''
+    INSERT INTO test_runs
+    (test_file, target_file, passed, duration_ms, error_message, coverage_percent,
+     timestamp)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+'''
+
+_SQL_INSERT_TDD_CYCLE = '''
+    INSERT INTO tdd_cycles (filepath, cycle_type, details, timestamp)
+    VALUES (?, ?, ?, ?)
+'''
+
+_SQL_INSERT_VIOLATION = '''
+    INSERT INTO violations (filepath, violation_type, severity, message, timestamp)
+    VALUES (?, ?, ?, ?, ?)
+'''
+
+_SQL_SELECT_FILE_STATE = '''
+    SELECT file_hash, last_modified, last_tested, test_passed,
+           test_coverage, complexity_score
+    FROM file_state WHERE filepath = ?
+'''
+
+_SQL_SELECT_TEST_STATUS = '''
+    SELECT CASE
+               WHEN NOT COALESCE(test_passed, 0) THEN 1
+               WHEN last_tested IS NOT NULL AND ? - last_tested > ? THEN 2
+               ELSE 0
+           END,
+           file_hash, last_tested
+    FROM file_state WHERE filepath = ?
+'''
+
+_SQL_SELECT_RECENT_CYCLES = '''
+    SELECT cycle_type, timestamp, details
+    FROM tdd_cycles
+    WHERE filepath = ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_TEST_HISTORY = '''
+    SELECT test_file, target_file, timestamp, passed,
+           duration_ms, coverage_percent
+    FROM test_runs
+    WHERE timestamp > ?
+    ORDER BY timestamp DESC
+    LIMIT ?
+'''
+
+_SQL_SELECT_TEST_SUMMARY = '''
+    SELECT COUNT(*), COALESCE(SUM(passed), 0)
+    FROM test_runs
+    WHERE timestamp > ?
+'''
+
+_SQL_SELECT_VIOLATION_SUMMARY = '''
+    SELECT violation_type, COUNT(*) as count
+    FROM violations
+    GROUP BY violation_type
+    ORDER BY count DESC
+'''
+
+def _now_us() -> int:
+    """Current time in microseconds since the epoch"""
+    return time.time_ns() // 1000
+
+def _format_timestamp(timestamp_us: Optional[int]) -> str:
+    """Render a stored timestamp as local 'YYYY-MM-DD HH:MM:SS'"""
+    if timestamp_us is None:
+        return 'N/A'
+    return datetime.fromtimestamp(timestamp_us / US_PER_SECOND).isoformat(
+        sep=' ', timespec='seconds'
+    )
+
+@lru_cache(maxsize=1024)
+def _listdir_cached(dirpath: str, dir_mtime_ns: int) -> frozenset:
+    """List a directory once per directory mtime"""
+    return frozenset(os.listdir(dirpath))
+
+def _listdir(dirpath: Path) -> frozenset:
+    """Return the entry names in dirpath, or an empty set if it cannot be listed"""
+    try:
+        return _listdir_cached(str(dirpath), os.stat(dirpath).st_mtime_ns)
+    except OSError:
+        return frozenset()
+
+def _insert_many(conn: sqlite3.Connection, sql: str, rows: List[Tuple]):
+    """Insert rows inside a single explicit transaction"""
+    conn.execute('BEGIN')
+    try:
+        conn.executemany(sql, rows)
+    except BaseException:
+        conn.execute('ROLLBACK')
+        raise
+    conn.execute('COMMIT')
+
+def _close_connection(conn: sqlite3.Connection, lock: threading.Lock,
+                      pending_cycles: List[Tuple[str, str, str, int]]):
+    """Write buffered cycles, then close the connection once it is idle"""
+    with lock:
+        try:
+            if pending_cycles:
+                _insert_many(conn, _SQL_INSERT_TDD_CYCLE, pending_cycles)
+                pending_cycles.clear()
+        finally:
+            conn.close()
 
 class TDDDatabase:
     """SQLite-based TDD state tracking"""
     
+    # Seconds to coalesce queued cycle events before writing them in one batch
+    FLUSH_DELAY = 0.5
+    
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or (Path.home() / '.tdd-state' / 'tdd.db')
         self.db_path.parent.mkdir(exist_ok=True)
+        
+        # One autocommit connection for the lifetime of the tracker keeps the
+        # page cache warm; the lock serializes access across threads
+        self._conn = sqlite3.connect(
+            self.db_path, check_same_thread=False, isolation_level=None,
+            cached_statements=256
+        )
+        # Rows support access by column name without building a dict per row
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        
+        # filepath -> (st_mtime_ns, st_size, hash) of the last hashed version
+        self._hash_cache: Dict[str, Tuple[int, int, str]] = {}
+        # Commits made through this connection, which data_version ignores
+        self._writes = 0
+        # (filepath, cycle_type, details, timestamp_us) events not yet written;
+        # guarded by the connection lock so a failed write leaves them queued
+        self._pending_cycles: List[Tuple[str, str, str, int]] = []
+        self._flush_timer: Optional[threading.Timer] = None
+        # Writes queued cycles and closes the connection when the tracker is
+        # collected or at exit, without the exit hook keeping it alive
+        self._finalizer = weakref.finalize(
+            self, _close_connection, self._conn, self._lock, self._pending_cycles
+        )
         self.init_db()
     
+    def close(self):
+        """Write queued cycles and close the database connection"""
+        with self._lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+        self._finalizer()
+    
     def init_db(self):
         """Initialize database schema"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
+        with self._lock:
+            # WAL with synchronous=NORMAL avoids an fsync on every insert
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('PRAGMA synchronous=NORMAL')
+            self._conn.execute('PRAGMA temp_store=MEMORY')
+            self._conn.execute('PRAGMA cache_size=-64000')
+            self._conn.execute('PRAGMA mmap_size=268435456')
+            
+            self._conn.execute('''
                 CREATE TABLE IF NOT EXISTS file_state (
                     filepath TEXT PRIMARY KEY,
-                    file_hash TEXT NOT NULL,
-                    last_modified TIMESTAMP,
-                    last_tested TIMESTAMP,
+                    file_hash TEXT NOT NULL,  -- BLAKE2b-128 hex digest
+                    last_modified INTEGER,
+                    last_tested INTEGER,
                     test_passed BOOLEAN,
                     test_coverage REAL,
                     complexity_score INTEGER
                 )
             ''')
             
-            conn.execute('''
+            self._conn.execute('''
                 CREATE TABLE IF NOT EXISTS test_runs (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     test_file TEXT NOT NULL,
                     target_file TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    timestamp INTEGER NOT NULL,
                     passed BOOLEAN,
                     duration_ms INTEGER,
                     error_message TEXT,
@@ -48,176 +215,268 @@ class TDDDatabase:
                 )
             ''')
             
-            conn.execute('''
+            self._conn.execute('''
                 CREATE TABLE IF NOT EXISTS tdd_cycles (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     filepath TEXT NOT NULL,
                     cycle_type TEXT CHECK(cycle_type IN ('red', 'green', 'refactor')),
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    timestamp INTEGER NOT NULL,
                     details TEXT
                 )
             ''')
             
-            conn.execute('''
+            self._conn.execute('''
                 CREATE TABLE IF NOT EXISTS violations (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     filepath TEXT NOT NULL,
                     violation_type TEXT,
-                    timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    timestamp INTEGER NOT NULL,
                     severity TEXT CHECK(severity IN ('warning', 'error', 'critical')),
                     message TEXT
                 )
             ''')
+            
+            # Indexes matching the WHERE/ORDER BY/GROUP BY of the get_* queries
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_cycles_file_ts
+                ON tdd_cycles(filepath, timestamp DESC)
+            ''')
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_runs_ts
+                ON test_runs(timestamp DESC)
+            ''')
+            self._conn.execute('''
+                CREATE INDEX IF NOT EXISTS idx_viol_type
+                ON violations(violation_type)
+            ''')
+            
+            if self._conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION:
+                self._migrate_timestamps()
+    
+    def _migrate_timestamps(self):
+        """Convert TEXT timestamps from older databases to epoch microseconds"""
+        # CURRENT_TIMESTAMP defaults were UTC; file_state held local datetimes
+        columns = [
+            ('test_runs', 'timestamp', ''),
+            ('tdd_cycles', 'timestamp', ''),
+            ('violations', 'timestamp', ''),
+            ('file_state', 'last_modified', ", 'utc'"),
+            ('file_state', 'last_tested', ", 'utc'"),
+        ]
+        
+        self._conn.execute('BEGIN')
+        try:
+            for table, column, modifier in columns:
+                self._conn.execute(f'''
+                    UPDATE {table}
+                    SET {column} = CAST(strftime('%s', {column}{modifier}) AS INTEGER) * {US_PER_SECOND}
+                    WHERE typeof({column}) = 'text'
+                ''')
+            self._conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+        self._conn.execute('COMMIT')
     
     def record_file_state(self, filepath: str, test_passed: bool, 
                          coverage: Optional[float] = None):
         """Record the current state of a file"""
         file_hash = self._calculate_file_hash(filepath)
+        now = _now_us()
         
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT OR REPLACE INTO file_state 
-                (filepath, file_hash, last_modified, last_tested, test_passed, test_coverage)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (filepath, file_hash, datetime.now(), datetime.now(), 
-                  test_passed, coverage))
+        with self._lock:
+            self._conn.execute(_SQL_INSERT_FILE_STATE, (
+                filepath, file_hash, now, now, test_passed, coverage
+            ))
+            self._writes += 1
     
     def record_test_run(self, test_file: str, target_file: Optional[str],
                        passed: bool, duration_ms: int, 
                        error_message: Optional[str] = None,
                        coverage: Optional[float] = None):
         """Record a test run"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO test_runs 
-                (test_file, target_file, passed, duration_ms, error_message, coverage_percent)
-                VALUES (?, ?, ?, ?, ?, ?)
-            ''', (test_file, target_file, passed, duration_ms, error_message, coverage))
+        with self._lock:
+            self._conn.execute(_SQL_INSERT_TEST_RUN, (
+                test_file, target_file, passed, duration_ms, error_message, coverage,
+                _now_us()
+            ))
+            self._writes += 1
     
     def record_tdd_cycle(self, filepath: str, cycle_type: str, details: str = ""):
         """Record TDD cycle progression"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO tdd_cycles (filepath, cycle_type, details)
-                VALUES (?, ?, ?)
-            ''', (filepath, cycle_type, details))
+        self.record_tdd_cycles([(filepath, cycle_type, details)])
+    
+    def record_tdd_cycles(self, rows: List[Tuple[str, str, str]],
+                          timestamps: Optional[List[int]] = None):
+        """Record many (filepath, cycle_type, details) rows, stamped now or at timestamps"""
+        if timestamps is None:
+            timestamps = [_now_us()] * len(rows)
+        elif len(timestamps) != len(rows):
+            raise ValueError("timestamps must match rows one to one")
+        
+        self._executemany(_SQL_INSERT_TDD_CYCLE, [
+            tuple(row) + (timestamp,) for row, timestamp in zip(rows, timestamps)
+        ])
+    
+    def queue_tdd_cycle(self, filepath: str, cycle_type: str, details: str = ""):
+        """Buffer a cycle event for a batched write, keeping its timestamp"""
+        with self._lock:
+            self._pending_cycles.append((filepath, cycle_type, details, _now_us()))
+            if self._flush_timer is None:
+                self._flush_timer = threading.Timer(self.FLUSH_DELAY, self.flush_tdd_cycles)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+    
+    def flush_tdd_cycles(self):
+        """Write any queued cycle events to the database"""
+        with self._lock:
+            if self._flush_timer:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if self._pending_cycles:
+                _insert_many(self._conn, _SQL_INSERT_TDD_CYCLE, self._pending_cycles)
+                self._pending_cycles.clear()
+                self._writes += 1
     
     def record_violation(self, filepath: str, violation_type: str, 
                         severity: str, message: str):
         """Record a TDD violation"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute('''
-                INSERT INTO violations (filepath, violation_type, severity, message)
-                VALUES (?, ?, ?, ?)
-            ''', (filepath, violation_type, severity, message))
+        self.record_violations([(filepath, violation_type, severity, message)])
     
-    def get_file_state(self, filepath: str) -> Optional[Dict]:
+    def record_violations(self, rows: List[Tuple[str, str, str, str]]):
+        """Record many (filepath, violation_type, severity, message) rows at once"""
+        now = _now_us()
+        self._executemany(_SQL_INSERT_VIOLATION, [tuple(row) + (now,) for row in rows])
+    
+    def get_file_state(self, filepath: str) -> Optional[sqlite3.Row]:
         """Get current state of a file"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT file_hash, last_modified, last_tested, test_passed, 
-                       test_coverage, complexity_score
-                FROM file_state WHERE filepath = ?
-            ''', (filepath,))
-            row = cursor.fetchone()
-            
-            if row:
-                return {
-                    'file_hash': row[0],
-                    'last_modified': row[1],
-                    'last_tested': row[2],
-                    'test_passed': row[3],
-                    'test_coverage': row[4],
-                    'complexity_score': row[5]
-                }
-        return None
-    
-    def get_recent_cycles(self, filepath: str, limit: int = 10) -> List[Dict]:
+        with self._lock:
+            cursor = self._conn.execute(_SQL_SELECT_FILE_STATE, (filepath,))
+            return cursor.fetchone()
+    
+    def get_recent_cycles(self, filepath: str, limit: int = 10) -> List[sqlite3.Row]:
         """Get recent TDD cycles for a file"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT cycle_type, timestamp, details
-                FROM tdd_cycles 
-                WHERE filepath = ?
-                ORDER BY timestamp DESC
-                LIMIT ?
-            ''', (filepath, limit))
-            
-            return [
-                {'cycle_type': row[0], 'timestamp': row[1], 'details': row[2]}
-                for row in cursor.fetchall()
-            ]
+        self.flush_tdd_cycles()
+        with self._lock:
+            cursor = self._conn.execute(_SQL_SELECT_RECENT_CYCLES, (filepath, limit))
+            return cursor.fetchall()
     
-    def get_test_history(self, days: int = 7) -> List[Dict]:
-        """Get test run history"""
-        cutoff = datetime.now() - timedelta(days=days)
-        
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT test_file, target_file, timestamp, passed, 
-                       duration_ms, coverage_percent
-                FROM test_runs
-                WHERE timestamp > ?
-                ORDER BY timestamp DESC
-            ''', (cutoff,))
-            
-            return [
-                {
-                    'test_file': row[0],
-                    'target_file': row[1],
-                    'timestamp': row[2],
-                    'passed': row[3],
-                    'duration_ms': row[4],
-                    'coverage_percent': row[5]
-                }
-                for row in cursor.fetchall()
-            ]
+    def get_test_history(self, days: int = 7,
+                         limit: Optional[int] = None) -> List[sqlite3.Row]:
+        """Get test run history, newest first"""
+        cutoff = _now_us() - days * 86400 * US_PER_SECOND
+        
+        with self._lock:
+            cursor = self._conn.execute(
+                _SQL_SELECT_TEST_HISTORY,
+                (cutoff, -1 if limit is None else limit)
+            )
+            return cursor.fetchall()
+    
+    def get_test_summary(self, days: int = 7) -> Tuple[int, int]:
+        """Get (total, passed) test run counts"""
+        cutoff = _now_us() - days * 86400 * US_PER_SECOND
+        
+        with self._lock:
+            return tuple(self._conn.execute(_SQL_SELECT_TEST_SUMMARY, (cutoff,)).fetchone())
     
     def get_violation_summary(self) -> Dict[str, int]:
         """Get summary of violations by type"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute('''
-                SELECT violation_type, COUNT(*) as count
-                FROM violations
-                GROUP BY violation_type
-                ORDER BY count DESC
-            ''')
+        with self._lock:
+            cursor = self._conn.execute(_SQL_SELECT_VIOLATION_SUMMARY)
             
             return {row[0]: row[1] for row in cursor.fetchall()}
     
+    def state_version(self) -> Tuple[int, int]:
+        """Return a value that changes whenever any connection commits"""
+        with self._lock:
+            data_version = self._conn.execute('PRAGMA data_version').fetchone()[0]
+            return data_version, self._writes
+    
     def needs_test(self, filepath: str) -> Tuple[bool, str]:
         """Check if a file needs testing with reason"""
+        return self.test_status(filepath)[:2]
+    
+    def test_status(self, filepath: str) -> Tuple[bool, str, Optional[int]]:
+        """Return needs_test's verdict and the microsecond time it goes stale, or None"""
         if not Path(filepath).exists():
-            return True, "File does not exist"
+            return True, "File does not exist", None
         
-        current_hash = self._calculate_file_hash(filepath)
-        state = self.get_file_state(filepath)
+        # Failed and stale results are decided in SQL; the file is hashed
+        # only if both of those checks pass
+        with self._lock:
+            row = self._conn.execute(
+                _SQL_SELECT_TEST_STATUS, (_now_us(), STALE_AFTER_US, filepath)
+            ).fetchone()
         
-        if not state:
-            return True, "No test history found"
+        if not row:
+            return True, "No test history found", None
         
-        if state['file_hash'] != current_hash:
-            return True, "File has been modified since last test"
+        status, file_hash, last_tested = row
+        if status == 1:
+            return True, "Previous test failed", None
         
-        if not state['test_passed']:
-            return True, "Previous test failed"
+        if status == 2:
+            return True, "Test results are stale (>1 hour old)", None
         
-        # Check if test is stale
-        if state['last_tested']:
-            last_tested = datetime.fromisoformat(state['last_tested'])
-            if datetime.now() - last_tested > timedelta(hours=1):
-                return True, "Test results are stale (>1 hour old)"
+        if file_hash != self._calculate_file_hash(filepath):
+            return True, "File has been modified since last test", None
+        
+        expires = None if last_tested is None else last_tested + STALE_AFTER_US
+        return False, "Tests are up to date", expires
+    
+    def _executemany(self, sql: str, rows: List[Tuple]):
+        """Insert rows inside a single explicit transaction"""
+        if not rows:
+            return
         
-        return False, "Tests are up to date"
+        with self._lock:
+            _insert_many(self._conn, sql, rows)
+            self._writes += 1
     
     def _calculate_file_hash(self, filepath: str) -> str:
-        """Calculate SHA256 hash of file content"""
-        with open(filepath, 'rb') as f:
-            return hashlib.sha256(f.read()).hexdigest()
+        """Calculate BLAKE2b hash of file content, skipping unchanged files"""
+        st = os.stat(filepath)
+        key = (st.st_mtime_ns, st.st_size)
+        
+        cached = self._hash_cache.get(filepath)
+        if cached and cached[:2] == key:
+            return cached[2]
+        
+        hasher = hashlib.blake2b(digest_size=16)
+        with open(filepath, 'rb', buffering=0) as f:
+            if st.st_size > 16 << 20:
+                # Let the kernel page large files in rather than copying them
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    hasher.update(mapped)
+            else:
+                for chunk in iter(lambda: f.read(1 << 20), b''):
+                    hasher.update(chunk)
+        file_hash = hasher.hexdigest()
+        
+        self._hash_cache[filepath] = key + (file_hash,)
+        return file_hash
 
 class TDDReporter:
     """Generate TDD compliance reports"""
     
+    _TEXT_ROW_TEMPLATE = "{timestamp} | {status} | {test_file}"
+    
+    _HTML_ROW_TEMPLATE = """
+                <tr>
+                    <td>{timestamp}</td>
+                    <td class="{status_class}">{status}</td>
+                    <td>{test_file}</td>
+                    <td>{duration_ms}</td>
+                </tr>
+            """
+    
+    _HTML_FOOTER = """
+            </table>
+        </body>
+        </html>
+        """
+    
     def __init__(self, db: TDDDatabase):
         self.db = db
     
@@ -232,19 +491,18 @@ class TDDReporter:
     
     def _text_report(self) -> str:
         """Generate text format report"""
+        generated = datetime.now().isoformat(sep=' ', timespec='seconds')
         report = []
         report.append("=" * 60)
         report.append("TDD Compliance Report")
         report.append("=" * 60)
-        report.append(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        report.append(f"Generated: {generated}")
         report.append("")
         
         # Test history summary
-        history = self.db.get_test_history(days=7)
-        if history:
-            total_runs = len(history)
-            passed_runs = sum(1 for h in history if h['passed'])
-            pass_rate = (passed_runs / total_runs) * 100 if total_runs > 0 else 0
+        total_runs, passed_runs = self.db.get_test_summary(days=7)
+        if total_runs:
+            pass_rate = self._calculate_pass_rate(total_runs, passed_runs)
             
             report.append(f"Test Runs (Last 7 days): {total_runs}")
             report.append(f"Pass Rate: {pass_rate:.1f}%")
@@ -261,36 +519,47 @@ class TDDReporter:
         # Recent test runs
         report.append("Recent Test Runs:")
         report.append("-" * 40)
-        for run in history[:10]:
-            status = "PASS" if run['passed'] else "FAIL"
-            report.append(f"{run['timestamp']} | {status} | {run['test_file']}")
+        history = self.db.get_test_history(days=7, limit=10)
+        report.extend(
+            self._TEXT_ROW_TEMPLATE.format(
+                timestamp=_format_timestamp(run['timestamp']),
+                status="PASS" if run['passed'] else "FAIL",
+                test_file=run['test_file']
+            )
+            for run in history
+        )
         
         return "\n".join(report)
     
     def _json_report(self) -> str:
         """Generate JSON format report"""
-        history = self.db.get_test_history(days=7)
+        total_runs, passed_runs = self.db.get_test_summary(days=7)
         violations = self.db.get_violation_summary()
         
         report_data = {
             'generated': datetime.now().isoformat(),
             'summary': {
-                'total_runs': len(history),
-                'passed_runs': sum(1 for h in history if h['passed']),
-                'pass_rate': self._calculate_pass_rate(history)
+                'total_runs': total_runs,
+                'passed_runs': passed_runs,
+                'pass_rate': self._calculate_pass_rate(total_runs, passed_runs)
             },
             'violations': violations,
-            'recent_runs': history[:20]
+            'recent_runs': [
+                dict(run, timestamp=_format_timestamp(run['timestamp']))
+                for run in self.db.get_test_history(days=7, limit=20)
+            ]
         }
         
         return json.dumps(report_data, indent=2)
     
     def _html_report(self) -> str:
         """Generate HTML format report"""
-        history = self.db.get_test_history(days=7)
-        pass_rate = self._calculate_pass_rate(history)
+        generated = datetime.now().isoformat(sep=' ', timespec='seconds')
+        total_runs, passed_runs = self.db.get_test_summary(days=7)
+        pass_rate = self._calculate_pass_rate(total_runs, passed_runs)
+        history = self.db.get_test_history(days=7, limit=20)
         
-        html = f"""
+        header = f"""
         <!DOCTYPE html>
         <html>
         <head>
@@ -308,12 +577,12 @@ class TDDReporter:
         </head>
         <body>
             <h1>TDD Compliance Report</h1>
-            <p>Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</p>
+            <p>Generated: {generated}</p>
             
             <div class="metrics">
                 <div class="metric">
                     <h3>Test Runs (7 days)</h3>
-                    <p>{len(history)}</p>
+                    <p>{total_runs}</p>
                 </div>
                 <div class="metric">
                     <h3>Pass Rate</h3>
@@ -331,36 +600,33 @@ class TDDReporter:
                 </tr>
         """
         
-        for run in history[:20]:
-            status_class = 'pass' if run['passed'] else 'fail'
-            status_text = 'PASS' if run['passed'] else 'FAIL'
-            html += f"""
-                <tr>
-                    <td>{run['timestamp']}</td>
-                    <td class="{status_class}">{status_text}</td>
-                    <td>{run['test_file']}</td>
-                    <td>{run.get('duration_ms', 'N/A')}</td>
-                </tr>
-            """
-        
-        html += """
-            </table>
-        </body>
-        </html>
-        """
+        parts = [header]
+        parts.extend(
+            self._HTML_ROW_TEMPLATE.format(
+                timestamp=_format_timestamp(run['timestamp']),
+                status_class='pass' if run['passed'] else 'fail',
+                status='PASS' if run['passed'] else 'FAIL',
+                test_file=run['test_file'],
+                duration_ms=run['duration_ms']
+            )
+            for run in history
+        )
+        parts.append(self._HTML_FOOTER)
         
-        return html
+        return "".join(parts)
     
-    def _calculate_pass_rate(self, history: List[Dict]) -> float:
+    def _calculate_pass_rate(self, total_runs: int, passed_runs: int) -> float:
         """Calculate test pass rate"""
-        if not history:
+        if not total_runs:
             return 0.0
-        passed = sum(1 for h in history if h['passed'])
-        return (passed / len(history)) * 100
+        return (passed_runs / total_runs) * 100
 
 class TDDEnforcer:
     """Enhanced TDD enforcement with cycle tracking"""
     
+    # Exact test file names looked up in the directory and its tests/ subdirectory
+    _TEST_PATTERNS = ("test_{stem}.py", "{stem}_test.py")
+    
     def __init__(self, db: TDDDatabase):
         self.db = db
         self.current_cycle = None
@@ -368,21 +634,25 @@ class TDDEnforcer:
     def start_red_phase(self, filepath: str):
         """Start the RED phase - write failing test"""
         self.current_cycle = 'red'
-        self.db.record_tdd_cycle(filepath, 'red', 'Writing failing test')
+        self.db.queue_tdd_cycle(filepath, 'red', 'Writing failing test')
         print("🔴 RED Phase: Write a failing test")
     
     def start_green_phase(self, filepath: str):
         """Start the GREEN phase - make test pass"""
         self.current_cycle = 'green'
-        self.db.record_tdd_cycle(filepath, 'green', 'Making test pass')
+        self.db.queue_tdd_cycle(filepath, 'green', 'Making test pass')
         print("🟢 GREEN Phase: Make the test pass")
     
     def start_refactor_phase(self, filepath: str):
         """Start the REFACTOR phase - improve code"""
         self.current_cycle = 'refactor'
-        self.db.record_tdd_cycle(filepath, 'refactor', 'Refactoring code')
+        self.db.queue_tdd_cycle(filepath, 'refactor', 'Refactoring code')
         print("🔵 REFACTOR Phase: Improve the code")
     
+    def flush(self):
+        """Write any buffered cycle events to the database"""
+        self.db.flush_tdd_cycles()
+    
     def validate_cycle_transition(self, filepath: str, 
                                  from_phase: str, to_phase: str) -> bool:
         """Validate TDD cycle transitions"""
@@ -417,11 +687,9 @@ class TDDEnforcer:
             return False
         
         # Check if test was modified recently
-        impl_stat = Path(filepath).stat()
-        for test_file in test_files:
-            test_stat = Path(test_file).stat()
-            if test_stat.st_mtime > impl_stat.st_mtime:
-                return True
+        impl_mtime = os.stat(filepath).st_mtime_ns
+        if any(os.stat(test_file).st_mtime_ns > impl_mtime for test_file in test_files):
+            return True
         
         self.db.record_violation(
             filepath,
@@ -437,20 +705,11 @@ class TDDEnforcer:
         stem = path.stem
         parent = path.parent
         
-        patterns = [
-            f"test_{stem}.py",
-            f"{stem}_test.py",
-            f"tests/test_{stem}.py",
-            f"tests/{stem}_test.py"
-        ]
+        names = [pattern.format(stem=stem) for pattern in self._TEST_PATTERNS]
         
         test_files = []
-        for pattern in patterns:
-            matches = list(parent.glob(pattern))
-            if parent.name != 'tests':
-                tests_dir = parent / 'tests'
-                if tests_dir.exists():
-                    matches.extend(tests_dir.glob(pattern.split('/')[-1]))
-            test_files.extend(str(f) for f in matches if f.exists())
+        for directory in (parent, parent / 'tests'):
+            entries = _listdir(directory)
+            test_files.extend(str(directory / name) for name in names if name in entries)
         
         return test_files
\ No newline at end of file
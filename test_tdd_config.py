@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Tests for tdd_config.py
+"""
+
+from pathlib import PurePosixPath
+
+from tdd_config import TDDConfig, compile_patterns
+
+class TestCompilePatterns:
+    """compile_patterns must agree with PurePath.match"""
+
+    PATTERNS = [
+        '[!]]x.py', '[^a]x.py', '[]]x.py', '[!a]x.py', '?x.py', '*x.py',
+        'test_*.py', 'tests/test_*.py', '/src/*.py', 'a[', 'x.py',
+    ] + TDDConfig.DEFAULT_CONFIG['test_patterns']
+
+    PATHS = [
+        'bx.py', 'ax.py', ']x.py', '^x.py', '/x.py', 'q/x.py', 'x.py',
+        'test_a.py', 'test_a/b.py', '/a/test_b/c.py', 'tests/test_a.py',
+        'pkg/tests/test_a.py', '/src/a.py', '/src/b/a.py', 'src/a.py',
+        'a[', 'a_test.py', 'test/a_test.py', 'pkg/test/test_a.py',
+    ]
+
+    def test_matches_pure_path(self):
+        """Test every pattern against every path"""
+        for pattern in self.PATTERNS:
+            regex = compile_patterns([pattern])
+            for path in self.PATHS:
+                expected = PurePosixPath(path).match(pattern)
+                assert bool(regex.search(path)) == expected, (pattern, path)
+
+    def test_combined_patterns(self):
+        """Test that combined patterns match if any single pattern does"""
+        regex = compile_patterns(self.PATTERNS)
+        for path in self.PATHS:
+            expected = any(PurePosixPath(path).match(p) for p in self.PATTERNS)
+            assert bool(regex.search(path)) == expected, path
+
+    def test_empty_patterns_match_nothing(self):
+        """Test that no patterns never match"""
+        assert compile_patterns([]).search('test_a.py') is None
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Tests for tdd_tracker.py
+"""
+
+import calendar
+import sqlite3
+import time
+
+import pytest
+from tdd_tracker import SCHEMA_VERSION, US_PER_SECOND, TDDDatabase
+
+# Schema written by releases that stored timestamps as TEXT
+BASELINE_SCHEMA = '''
+    CREATE TABLE file_state (
+        filepath TEXT PRIMARY KEY,
+        file_hash TEXT NOT NULL,
+        last_modified TIMESTAMP,
+        last_tested TIMESTAMP,
+        test_passed BOOLEAN,
+        test_coverage REAL,
+        complexity_score INTEGER
+    );
+    CREATE TABLE test_runs (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        test_file TEXT NOT NULL,
+        target_file TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        passed BOOLEAN,
+        duration_ms INTEGER,
+        error_message TEXT,
+        coverage_percent REAL
+    );
+    CREATE TABLE tdd_cycles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filepath TEXT NOT NULL,
+        cycle_type TEXT CHECK(cycle_type IN ('red', 'green', 'refactor')),
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        details TEXT
+    );
+    CREATE TABLE violations (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        filepath TEXT NOT NULL,
+        violation_type TEXT,
+        timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        severity TEXT CHECK(severity IN ('warning', 'error', 'critical')),
+        message TEXT
+    );
+'''
+
+def _utc_us(*fields):
+    """Epoch microseconds for a UTC date and time"""
+    return calendar.timegm(fields + (0, 0, 0)) * US_PER_SECOND
+
+@pytest.fixture
+def new_york_tz(monkeypatch):
+    """Run with local time set to US Eastern, restoring it afterwards"""
+    monkeypatch.setenv('TZ', 'EST5EDT,M3.2.0,M11.1.0')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """A database populated by the TEXT-timestamp schema"""
+    path = tmp_path / 'tdd.db'
+    conn = sqlite3.connect(path)
+    conn.executescript(BASELINE_SCHEMA)
+    # file_state held local datetimes; the other tables defaulted to UTC
+    conn.execute(
+        "INSERT INTO file_state VALUES ('a.py', 'h', ?, ?, 1, NULL, NULL)",
+        ('2024-01-02 03:04:05.123456', '2024-07-02 03:04:05.123456')
+    )
+    conn.execute(
+        "INSERT INTO test_runs (test_file, timestamp, passed) VALUES (?, ?, 1)",
+        ('test_a.py', '2024-01-02 03:04:05')
+    )
+    conn.execute(
+        "INSERT INTO tdd_cycles (filepath, cycle_type, timestamp) VALUES (?, ?, ?)",
+        ('a.py', 'red', '2024-01-02 03:04:06')
+    )
+    conn.execute(
+        "INSERT INTO violations (filepath, violation_type, severity, timestamp) "
+        "VALUES (?, ?, ?, ?)",
+        ('a.py', 'no_test_found', 'critical', '2024-01-02 03:04:07')
+    )
+    conn.commit()
+    conn.close()
+    return path
+
+class TestTimestampMigration:
+    """Test conversion of TEXT timestamps to epoch microseconds"""
+
+    def test_migrates_every_timestamp(self, baseline_db, new_york_tz):
+        """Test UTC columns stay UTC and local file_state times are shifted"""
+        db = TDDDatabase(baseline_db)
+        conn = db._conn
+
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        assert tuple(conn.execute(
+            'SELECT last_modified, last_tested FROM file_state'
+        ).fetchone()) == (_utc_us(2024, 1, 2, 8, 4, 5), _utc_us(2024, 7, 2, 7, 4, 5))
+        assert conn.execute('SELECT timestamp FROM test_runs').fetchone()[0] == \
+            _utc_us(2024, 1, 2, 3, 4, 5)
+        assert conn.execute('SELECT timestamp FROM tdd_cycles').fetchone()[0] == \
+            _utc_us(2024, 1, 2, 3, 4, 6)
+        assert conn.execute('SELECT timestamp FROM violations').fetchone()[0] == \
+            _utc_us(2024, 1, 2, 3, 4, 7)
+        db.close()
+
+    def test_migration_runs_once(self, baseline_db, new_york_tz):
+        """Test reopening a migrated database leaves it unchanged"""
+        TDDDatabase(baseline_db).close()
+        db = TDDDatabase(baseline_db)
+
+        assert db.get_test_summary(days=100000) == (1, 1)
+        assert db._conn.execute('SELECT timestamp FROM test_runs').fetchone()[0] == \
+            _utc_us(2024, 1, 2, 3, 4, 5)
+        db.close()
+
+    def test_failed_migration_rolls_back(self, baseline_db):
+        """Test a failing UPDATE leaves the database as it was and unlocked"""
+        conn = sqlite3.connect(baseline_db)
+        conn.execute('''
+            CREATE TRIGGER reject BEFORE UPDATE ON violations
+            BEGIN SELECT RAISE(ABORT, 'rejected'); END
+        ''')
+        conn.commit()
+
+        # Holding the traceback keeps the failed tracker and its connection
+        # alive, so a transaction left open on it would hold the write lock
+        with pytest.raises(sqlite3.IntegrityError) as excinfo:
+            TDDDatabase(baseline_db)
+
+        conn.execute('DROP TRIGGER reject')
+        conn.commit()
+        assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+        assert conn.execute('SELECT typeof(timestamp) FROM test_runs').fetchone()[0] == 'text'
+        conn.close()
+
+        db = TDDDatabase(baseline_db)
+        assert db._conn.execute('PRAGMA user_version').fetchone()[0] == SCHEMA_VERSION
+        db.close()
+        del excinfo